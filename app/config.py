@@ -8,6 +8,11 @@ class Settings(BaseSettings):
     resend_api_key: str = ""
     from_email: str = "onboarding@resend.dev"
     database_url: str = ""  # Supabase PostgreSQL connection string
+    scraper_concurrency: int = 16  # Max simultaneous scrapes in the cron pass
+    # Cron pre-filter: skip re-scraping products whose recent lowest
+    # price is still above target * margin; 0 disables the filter
+    scrape_skip_margin: float = 1.2
+    scrape_timeout_seconds: float = 30.0  # Per-product cap in the cron pass
 
     class Config:
         env_file = ".env"
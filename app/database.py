@@ -1,81 +1,314 @@
+import asyncio
+import time
 import asyncpg
 from typing import Optional, List
 from datetime import datetime
 from .config import get_settings
+from .models import ProductRow, ProductView
 
 # Connection pool
 _pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+
+# Home-page cache: (monotonic timestamp, product list). The dashboard only
+# changes when a scrape lands or a product is edited, so page hits between
+# scrapes can reuse the last computed list instead of re-running the join.
+# Every mutator below drops the cache; the TTL is just a backstop for
+# writes from other processes (e.g. the cron scraper).
+_products_cache: Optional[tuple] = None
+_PRODUCTS_CACHE_TTL = 30.0
+
+
+def _invalidate_products_cache():
+    global _products_cache
+    _products_cache = None
+
+# Hot-path SQL, hoisted to module level so every call site reuses the exact
+# same query text and therefore hits asyncpg's per-connection prepared
+# statement cache instead of re-parsing and re-planning on the server.
+SELECT_PRODUCT = "SELECT * FROM products WHERE id = $1"
+# One query text for both the filtered and unfiltered listing, so a single
+# cached plan serves both branches
+# alert_recent preloads the 24h cooldown state so a scrape pass over
+# the result never re-queries alerts_sent per product; the EXISTS probe
+# is an index seek on (product_id, sent_at DESC). lowest_price_fresh is
+# evaluated against the same NOW() that wrote lowest_price_updated_at,
+# so the cron skip gate doesn't depend on client and server clocks (or
+# timezones) agreeing.
+SELECT_PRODUCTS = """
+    SELECT p.*, EXISTS (
+        SELECT 1 FROM alerts_sent a
+        WHERE a.product_id = p.id
+        AND a.sent_at > NOW() - INTERVAL '24 hours'
+    ) AS alert_recent,
+    (p.lowest_price_updated_at > NOW() - INTERVAL '24 hours')
+        AS lowest_price_fresh
+    FROM products p
+    WHERE (NOT $1::bool OR p.is_active = TRUE)
+    ORDER BY p.created_at DESC
+"""
+# Set-based batch insert that drops rows identical to one recorded in
+# the last hour: back-to-back scrape runs would otherwise append a
+# duplicate row per retailer per run even when nothing moved. The
+# window (rather than a global unique index) keeps history honest when
+# a price later returns to an old value; the NOT EXISTS probe is
+# covered by the v2 (product_id, retailer, scraped_at DESC) index.
+INSERT_PRICES_DEDUPED = """
+    INSERT INTO price_history (product_id, retailer, price, currency, url)
+    SELECT t.product_id, t.retailer, t.price, t.currency, t.url
+    FROM unnest($1::int[], $2::text[], $3::real[], $4::text[], $5::text[])
+        AS t(product_id, retailer, price, currency, url)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM price_history ph
+        WHERE ph.product_id = t.product_id
+        AND ph.retailer = t.retailer
+        AND ph.price = t.price
+        AND ph.url = t.url
+        AND ph.scraped_at > NOW() - INTERVAL '1 hour'
+    )
+"""
+SELECT_PRICE_HISTORY = """
+    SELECT * FROM price_history
+    WHERE product_id = $1
+    ORDER BY scraped_at DESC
+    LIMIT $2
+"""
+SELECT_LATEST_PRICES = """
+    SELECT DISTINCT ON (retailer) *
+    FROM price_history
+    WHERE product_id = $1
+    ORDER BY retailer, scraped_at DESC
+"""
+# Static statements for the single-column updates the routers actually
+# issue (toggling active state, editing the target price); these keep one
+# cached plan each instead of rebuilding SQL text per call.
+UPDATE_SINGLE_COLUMN = {
+    "is_active": "UPDATE products SET is_active = $1 WHERE id = $2",
+    "target_price": "UPDATE products SET target_price = $1 WHERE id = $2",
+}
+TOGGLE_PRODUCT_ACTIVE = """
+    UPDATE products SET is_active = NOT is_active
+    WHERE id = $1
+    RETURNING is_active
+"""
+UPDATE_LOWEST_PRICE = """
+    UPDATE products
+    SET lowest_price = $1,
+        lowest_price_retailer = $2,
+        lowest_price_url = $3,
+        lowest_price_updated_at = NOW()
+    WHERE id = $4
+"""
+# The cutoff is bound as a parameter (never %-formatted into the SQL text):
+# interpolating `hours` produced a distinct query string per value, which
+# defeated the statement cache and was an injection hazard.
+SELECT_RECENT_ALERT = """
+    SELECT * FROM alerts_sent
+    WHERE product_id = $1
+    AND sent_at > NOW() - ($2 * INTERVAL '1 hour')
+    ORDER BY sent_at DESC
+    LIMIT 1
+"""
+INSERT_PRODUCT = """
+    INSERT INTO products (name, search_query, category, region, size, color, brand, model, storage, material, target_price, currency, user_email)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+    RETURNING id
+"""
+DELETE_PRODUCT = "DELETE FROM products WHERE id = $1"
+INSERT_ALERT = """
+    INSERT INTO alerts_sent (product_id, price, retailer)
+    VALUES ($1, $2, $3)
+    RETURNING id
+"""
 
 
 async def get_pool() -> asyncpg.Pool:
-    """Get or create database connection pool."""
+    """Get or create the shared database connection pool.
+
+    The pool is created once (normally during app lifespan startup via
+    init_db) and reused by every CRUD helper; the lock prevents two
+    concurrent first-callers from each opening their own pool.
+    """
     global _pool
-    if _pool is None:
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is not None:
+            return _pool
         settings = get_settings()
         _pool = await asyncpg.create_pool(
             settings.database_url,
             min_size=1,
-            max_size=10
+            max_size=10,
+            # Keep plenty of room for every hot statement's cached plan
+            statement_cache_size=256,
+            # Price rows and alerts are recoverable by a re-scrape, so we
+            # don't need a WAL flush on every commit. Asynchronous commit
+            # keeps writes durable-on-crash-window only, which roughly
+            # halves commit latency on fsync-bound storage.
+            server_settings={"synchronous_commit": "off"},
         )
     return _pool
 
 
+# Bump this when adding a migration step below
+SCHEMA_VERSION = 4
+
+
 async def init_db():
-    """Initialize the database with required tables."""
+    """Initialize the database, applying any pending migrations.
+
+    A schema_version table gates the DDL so each migration runs exactly
+    once; subsequent startups cost a single SELECT instead of replaying
+    every CREATE statement against the write lock.
+    """
     pool = await get_pool()
 
     async with pool.acquire() as conn:
-        # Create products table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                id SERIAL PRIMARY KEY,
-                name TEXT NOT NULL,
-                search_query TEXT NOT NULL,
-                category TEXT DEFAULT 'electronics',
-                region TEXT DEFAULT 'eu',
-                size TEXT,
-                color TEXT,
-                brand TEXT,
-                model TEXT,
-                storage TEXT,
-                material TEXT,
-                target_price REAL NOT NULL,
-                currency TEXT DEFAULT 'EUR',
-                user_email TEXT NOT NULL,
-                is_active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-
-        # Create price_history table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS price_history (
-                id SERIAL PRIMARY KEY,
-                product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                retailer TEXT NOT NULL,
-                price REAL NOT NULL,
-                currency TEXT DEFAULT 'USD',
-                url TEXT NOT NULL,
-                scraped_at TIMESTAMP DEFAULT NOW()
-            )
-        """)
-
-        # Create alerts_sent table
-        await conn.execute("""
-            CREATE TABLE IF NOT EXISTS alerts_sent (
-                id SERIAL PRIMARY KEY,
-                product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                price REAL NOT NULL,
-                retailer TEXT NOT NULL,
-                sent_at TIMESTAMP DEFAULT NOW()
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_version (v INTEGER PRIMARY KEY)"
+        )
+        current = await conn.fetchval("SELECT max(v) FROM schema_version") or 0
+        if current >= SCHEMA_VERSION:
+            return
+
+        async with conn.transaction():
+            if current < 1:
+                await _migrate_v1(conn)
+            if current < 2:
+                await _migrate_v2(conn)
+            if current < 3:
+                await _migrate_v3(conn)
+            if current < 4:
+                await _migrate_v4(conn)
+            # Web startup and the cron script can race through a first
+            # run together; the DDL above is IF NOT EXISTS-safe, and
+            # this keeps the loser from dying on the primary key
+            await conn.execute(
+                "INSERT INTO schema_version VALUES ($1) ON CONFLICT DO NOTHING",
+                SCHEMA_VERSION,
             )
-        """)
 
-        # Create index
-        await conn.execute("""
-            CREATE INDEX IF NOT EXISTS idx_price_history_product
-            ON price_history(product_id, scraped_at DESC)
-        """)
+
+async def _migrate_v1(conn):
+    """v1: initial tables and indexes."""
+    # Create products table
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS products (
+            id SERIAL PRIMARY KEY,
+            name TEXT NOT NULL,
+            search_query TEXT NOT NULL,
+            category TEXT DEFAULT 'electronics',
+            region TEXT DEFAULT 'eu',
+            size TEXT,
+            color TEXT,
+            brand TEXT,
+            model TEXT,
+            storage TEXT,
+            material TEXT,
+            target_price REAL NOT NULL,
+            currency TEXT DEFAULT 'EUR',
+            user_email TEXT NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+
+    # Create price_history table
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS price_history (
+            id SERIAL PRIMARY KEY,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            retailer TEXT NOT NULL,
+            price REAL NOT NULL,
+            currency TEXT DEFAULT 'USD',
+            url TEXT NOT NULL,
+            scraped_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+
+    # Create alerts_sent table
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS alerts_sent (
+            id SERIAL PRIMARY KEY,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            price REAL NOT NULL,
+            retailer TEXT NOT NULL,
+            sent_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+
+    # Create index
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_price_history_product
+        ON price_history(product_id, scraped_at DESC)
+    """)
+
+
+async def _migrate_v2(conn):
+    """v2: covering index for the latest-price-per-retailer lookups.
+
+    The original (product_id, scraped_at DESC) index doesn't include the
+    retailer group key, so DISTINCT ON (retailer) queries needed a sort.
+    This index matches the ORDER BY retailer, scraped_at DESC access
+    pattern exactly, and INCLUDE makes it covering so the heap is never
+    touched.
+    """
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_price_history_product_retailer
+        ON price_history(product_id, retailer, scraped_at DESC)
+        INCLUDE (price, url, currency)
+    """)
+
+
+async def _migrate_v3(conn):
+    """v3: materialized lowest-price cache columns on products.
+
+    Home and list views only ever show the single cheapest current price
+    per product; caching it on the products row lets those reads skip the
+    price_history scans entirely. The columns are refreshed by
+    add_price_records whenever a scrape batch lands.
+    """
+    await conn.execute("""
+        ALTER TABLE products
+        ADD COLUMN IF NOT EXISTS lowest_price REAL,
+        ADD COLUMN IF NOT EXISTS lowest_price_retailer TEXT,
+        ADD COLUMN IF NOT EXISTS lowest_price_url TEXT,
+        ADD COLUMN IF NOT EXISTS lowest_price_updated_at TIMESTAMP
+    """)
+
+    # Backfill from the cheapest of each product's latest-per-retailer prices
+    await conn.execute("""
+        UPDATE products p
+        SET lowest_price = l.price,
+            lowest_price_retailer = l.retailer,
+            lowest_price_url = l.url,
+            lowest_price_updated_at = NOW()
+        FROM (
+            SELECT DISTINCT ON (product_id) product_id, price, retailer, url
+            FROM (
+                SELECT DISTINCT ON (product_id, retailer)
+                       product_id, retailer, price, url
+                FROM price_history
+                ORDER BY product_id, retailer, scraped_at DESC
+            ) latest
+            ORDER BY product_id, price ASC
+        ) l
+        WHERE l.product_id = p.id
+    """)
+
+
+async def _migrate_v4(conn):
+    """v4: index for the recent-alert cooldown lookup.
+
+    get_recent_alert runs on every alert check; without an index it scans
+    all of a product's alert rows. This turns it into an index seek on
+    (product_id, sent_at DESC).
+    """
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_alerts_product_sent
+        ON alerts_sent(product_id, sent_at DESC)
+    """)
 
 
 async def close_db():
@@ -102,50 +335,102 @@ async def create_product(
     material: Optional[str] = None,
     currency: str = "EUR"
 ) -> int:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _pool.acquire() as conn:
         row = await conn.fetchrow(
-            """
-            INSERT INTO products (name, search_query, category, region, size, color, brand, model, storage, material, target_price, currency, user_email)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-            RETURNING id
-            """,
+            INSERT_PRODUCT,
             name, search_query, category, region, size, color, brand, model, storage, material, target_price, currency, user_email
         )
+        _invalidate_products_cache()
         return row['id']
 
 
-async def get_product(product_id: int) -> Optional[dict]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT * FROM products WHERE id = $1",
-            product_id
-        )
-        if row:
-            return dict(row)
-        return None
+async def get_product(product_id: int) -> Optional[asyncpg.Record]:
+    async with _pool.acquire() as conn:
+        return await conn.fetchrow(SELECT_PRODUCT, product_id)
 
 
-async def get_all_products(active_only: bool = False) -> List[dict]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        if active_only:
-            rows = await conn.fetch(
-                "SELECT * FROM products WHERE is_active = TRUE ORDER BY created_at DESC"
-            )
-        else:
-            rows = await conn.fetch(
-                "SELECT * FROM products ORDER BY created_at DESC"
-            )
-        return [dict(row) for row in rows]
+async def get_all_products(active_only: bool = False) -> List[ProductRow]:
+    async with _pool.acquire() as conn:
+        rows = await conn.fetch(SELECT_PRODUCTS, active_only)
+        return [ProductRow(**{key: row[key] for key in row.keys()}) for row in rows]
+
+
+async def get_products_with_latest_prices() -> List[ProductView]:
+    """Get all products with the latest price from each retailer, in one query.
+
+    Returns ProductView rows carrying a price-sorted "sources" list plus
+    lowest_price/lowest_price_retailer/lowest_price_url fields, replacing
+    the 1+N query pattern previously used to render the home page.
+
+    Results are served from a short-TTL in-process cache that mutators
+    invalidate, so repeated page loads between scrapes skip the database
+    entirely.
+    """
+    global _products_cache
+    if _products_cache is not None:
+        ts, cached = _products_cache
+        if time.monotonic() - ts < _PRODUCTS_CACHE_TTL:
+            return cached
+    async with _pool.acquire() as conn:
+        rows = await conn.fetch(
+            """
+            SELECT p.*,
+                   l.retailer AS src_retailer,
+                   l.price AS src_price,
+                   l.url AS src_url
+            FROM products p
+            LEFT JOIN (
+                SELECT DISTINCT ON (product_id, retailer)
+                       product_id, retailer, price, url
+                FROM price_history
+                ORDER BY product_id, retailer, scraped_at DESC
+            ) l ON l.product_id = p.id
+            ORDER BY p.created_at DESC, l.price ASC
+            """
+        )
+
+    products: dict = {}
+    ordered: List[ProductView] = []
+    for row in rows:
+        product = products.get(row["id"])
+        if product is None:
+            product = ProductView(**{
+                key: row[key] for key in row.keys() if not key.startswith("src_")
+            })
+            products[row["id"]] = product
+            ordered.append(product)
+        if row["src_retailer"] is not None:
+            product.sources.append({
+                "retailer": row["src_retailer"],
+                "price": row["src_price"],
+                "url": row["src_url"],
+            })
+
+    # Sources arrive price-sorted within each product, so the first is cheapest
+    for product in ordered:
+        if product.sources:
+            cheapest = product.sources[0]
+            product.lowest_price = cheapest["price"]
+            product.lowest_price_retailer = cheapest["retailer"]
+            product.lowest_price_url = cheapest["url"]
+
+    _products_cache = (time.monotonic(), ordered)
+    return ordered
 
 
 async def update_product(product_id: int, **kwargs) -> bool:
     if not kwargs:
         return False
 
-    pool = await get_pool()
+    # Fast path: single-column updates go through a static statement
+    if len(kwargs) == 1:
+        key, value = next(iter(kwargs.items()))
+        query = UPDATE_SINGLE_COLUMN.get(key)
+        if query:
+            async with _pool.acquire() as conn:
+                result = await conn.execute(query, value, product_id)
+                _invalidate_products_cache()
+                return result != "UPDATE 0"
 
     # Build dynamic update query
     set_clauses = []
@@ -157,120 +442,135 @@ async def update_product(product_id: int, **kwargs) -> bool:
     values.append(product_id)
     query = f"UPDATE products SET {', '.join(set_clauses)} WHERE id = ${len(values)}"
 
-    async with pool.acquire() as conn:
+    async with _pool.acquire() as conn:
         result = await conn.execute(query, *values)
+        _invalidate_products_cache()
         return result != "UPDATE 0"
 
 
+async def toggle_product_active(product_id: int) -> Optional[bool]:
+    """Atomically flip a product's active flag, returning the new state.
+
+    One UPDATE..RETURNING replaces the SELECT-then-UPDATE pair callers
+    used, halving round-trips and closing the race where two concurrent
+    toggles read the same old value. Returns None for an unknown id.
+    """
+    async with _pool.acquire() as conn:
+        new_state = await conn.fetchval(TOGGLE_PRODUCT_ACTIVE, product_id)
+    if new_state is not None:
+        _invalidate_products_cache()
+    return new_state
+
+
 async def delete_product(product_id: int) -> bool:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        result = await conn.execute(
-            "DELETE FROM products WHERE id = $1",
-            product_id
-        )
+    async with _pool.acquire() as conn:
+        result = await conn.execute(DELETE_PRODUCT, product_id)
+        _invalidate_products_cache()
         return result != "DELETE 0"
 
 
 # Price history operations
-async def add_price_record(
-    product_id: int,
-    retailer: str,
-    price: float,
-    url: str,
-    currency: str = "USD"
-) -> int:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            INSERT INTO price_history (product_id, retailer, price, currency, url)
-            VALUES ($1, $2, $3, $4, $5)
-            RETURNING id
-            """,
-            product_id, retailer, price, currency, url
-        )
-        return row['id']
+async def add_price_records(product_id: int, records: List[dict]) -> Optional[dict]:
+    """Insert a batch of scraped prices for a product in one round-trip.
+
+    Replaces per-row INSERTs (one commit and network round-trip each) with
+    a single executemany call. Returns the cheapest record of the batch
+    (which callers need for alert checks), or None for an empty batch.
+    """
+    if not records:
+        return None
+    # Build insert rows and track the cheapest record in the same pass
+    rows = []
+    cheapest = None
+    for r in records:
+        rows.append((
+            product_id,
+            r["retailer"],
+            r["price"],
+            r.get("currency", "USD"),
+            r.get("url", ""),
+        ))
+        if cheapest is None or r["price"] < cheapest["price"]:
+            cheapest = r
+    async with _pool.acquire() as conn:
+        # One transaction (and one commit/fsync) for the whole batch: the
+        # history rows and the lowest-price cache refresh land atomically
+        async with conn.transaction():
+            ids, retailers, prices, currencies, urls = zip(*rows)
+            await conn.execute(
+                INSERT_PRICES_DEDUPED, ids, retailers, prices, currencies, urls
+            )
+            await conn.execute(
+                UPDATE_LOWEST_PRICE,
+                cheapest["price"],
+                cheapest["retailer"],
+                cheapest.get("url", ""),
+                product_id,
+            )
+    _invalidate_products_cache()
+    return cheapest
+
+
+async def bulk_add_price_records(records: List[tuple]) -> None:
+    """Bulk-ingest scraped prices across many products in one statement.
+
+    `records` are (product_id, retailer, price, currency, url) tuples,
+    sent as parallel arrays through one set-based INSERT ... SELECT
+    unnest() -- still a single round-trip for the whole batch, and the
+    statement skips rows unchanged within the dedupe window so stable
+    prices stop inflating the table run after run. The lowest-price
+    cache columns are refreshed for every affected product in the same
+    transaction.
+    """
+    if not records:
+        return
+    # Track the cheapest row per product in the same pass over the batch
+    cheapest: dict = {}
+    for rec in records:
+        current = cheapest.get(rec[0])
+        if current is None or rec[2] < current[2]:
+            cheapest[rec[0]] = rec
+    async with _pool.acquire() as conn:
+        async with conn.transaction():
+            ids, retailers, prices, currencies, urls = zip(*records)
+            await conn.execute(
+                INSERT_PRICES_DEDUPED, ids, retailers, prices, currencies, urls
+            )
+            await conn.executemany(
+                UPDATE_LOWEST_PRICE,
+                [(rec[2], rec[1], rec[4], rec[0]) for rec in cheapest.values()],
+            )
+    _invalidate_products_cache()
 
 
-async def get_price_history(product_id: int, limit: int = 50) -> List[dict]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT * FROM price_history
-            WHERE product_id = $1
-            ORDER BY scraped_at DESC
-            LIMIT $2
-            """,
-            product_id, limit
-        )
-        return [dict(row) for row in rows]
+async def get_price_history(product_id: int, limit: int = 50) -> List[asyncpg.Record]:
+    async with _pool.acquire() as conn:
+        return await conn.fetch(SELECT_PRICE_HISTORY, product_id, limit)
 
 
-async def get_lowest_price(product_id: int) -> Optional[dict]:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT * FROM price_history
-            WHERE product_id = $1
-            ORDER BY price ASC
-            LIMIT 1
-            """,
-            product_id
-        )
-        if row:
-            return dict(row)
-        return None
-
-
-async def get_latest_prices(product_id: int) -> List[dict]:
+async def get_latest_prices(product_id: int) -> List[asyncpg.Record]:
     """Get the most recent price from each retailer for a product."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT DISTINCT ON (retailer) *
-            FROM price_history
-            WHERE product_id = $1
-            ORDER BY retailer, scraped_at DESC
-            """,
-            product_id
-        )
+    async with _pool.acquire() as conn:
+        rows = await conn.fetch(SELECT_LATEST_PRICES, product_id)
         # Sort by price after getting distinct retailers
-        return sorted([dict(row) for row in rows], key=lambda x: x['price'])
+        return sorted(rows, key=lambda x: x['price'])
 
 
 # Alert operations
 async def add_alert_record(product_id: int, price: float, retailer: str) -> int:
-    pool = await get_pool()
-    async with pool.acquire() as conn:
+    async with _pool.acquire() as conn:
         row = await conn.fetchrow(
-            """
-            INSERT INTO alerts_sent (product_id, price, retailer)
-            VALUES ($1, $2, $3)
-            RETURNING id
-            """,
+            INSERT_ALERT,
             product_id, price, retailer
         )
         return row['id']
 
 
-async def get_recent_alert(product_id: int, hours: int = 24) -> Optional[dict]:
+async def get_recent_alert(product_id: int, hours: int = 24) -> Optional[asyncpg.Record]:
     """Check if an alert was sent recently for this product."""
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT * FROM alerts_sent
-            WHERE product_id = $1
-            AND sent_at > NOW() - INTERVAL '%s hours'
-            ORDER BY sent_at DESC
-            LIMIT 1
-            """ % hours,
-            product_id
+    async with _pool.acquire() as conn:
+        return await conn.fetchrow(
+            SELECT_RECENT_ALERT,
+            product_id, hours
         )
-        if row:
-            return dict(row)
-        return None
+
@@ -1,22 +1,48 @@
+import httpx
 from fastapi import FastAPI, Request, Form
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
 from . import database
 from .routers import products, prices
+from .services import scraper
 from .services.scraper import scrape_product_prices
 
+# Browser-like headers for outbound page fetches; retailers serve bot
+# requests a queue page or a 403 otherwise
+SCRAPE_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    # Ask for compressed bodies explicitly; httpx decompresses natively
+    # (brotli is in requirements so br can be negotiated)
+    "Accept-Encoding": "gzip, br, deflate",
+}
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize database
     await database.init_db()
+    # One shared HTTP client for the app's lifetime: keep-alive pooling
+    # avoids a fresh TCP+TLS handshake on every outbound scrape
+    app.state.http = httpx.AsyncClient(
+        # HTTP/2 multiplexes concurrent scrapes of a CDN-fronted host
+        # over one TCP+TLS connection instead of opening several
+        http2=True,
+        follow_redirects=True,
+        timeout=15.0,
+        limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+        headers=SCRAPE_HEADERS,
+    )
     yield
-    # Shutdown: Close database connection pool
+    # Shutdown: Close HTTP clients and database connection pool
+    await app.state.http.aclose()
+    await scraper.close_client()
     await database.close_db()
 
 
@@ -25,6 +51,9 @@ app = FastAPI(
     description="Price monitoring and alert system",
     version="1.0.0",
     lifespan=lifespan,
+    # orjson serializes several times faster than stdlib json and handles
+    # datetimes natively, which matters for large /history responses
+    default_response_class=ORJSONResponse,
 )
 
 # Mount static files
@@ -45,18 +74,7 @@ app.include_router(prices.router)
 @app.get("/")
 async def home(request: Request):
     """Home page - list all products."""
-    products_list = await database.get_all_products()
-
-    # Enrich with latest prices and sources
-    for product in products_list:
-        latest_prices = await database.get_latest_prices(product["id"])
-        if latest_prices:
-            product["lowest_price"] = latest_prices[0]["price"]
-            product["lowest_price_retailer"] = latest_prices[0]["retailer"]
-            product["lowest_price_url"] = latest_prices[0]["url"]
-            product["sources"] = latest_prices  # All retailers found
-        else:
-            product["sources"] = []
+    products_list = await database.get_products_with_latest_prices()
 
     return templates.TemplateResponse(
         "index.html",
@@ -140,9 +158,7 @@ async def delete_product_web(product_id: int):
 @app.post("/product/{product_id}/toggle")
 async def toggle_product_web(product_id: int):
     """Toggle product active status from web UI."""
-    product = await database.get_product(product_id)
-    if product:
-        await database.update_product(product_id, is_active=not product["is_active"])
+    await database.toggle_product_active(product_id)
     return RedirectResponse(url="/", status_code=303)
 
 
@@ -155,27 +171,10 @@ async def scrape_product_web(product_id: int):
 
     try:
         # Scrape prices using SerpAPI
-        price_results = await scrape_product_prices(
-            product_id=product_id,
-            search_query=product["search_query"],
-            region=product.get("region", "eu"),
-            size=product.get("size"),
-            color=product.get("color"),
-            brand=product.get("brand"),
-            model=product.get("model"),
-            storage=product.get("storage"),
-            material=product.get("material"),
-        )
-
-        # Save prices to database
-        for price_data in price_results:
-            await database.add_price(
-                product_id=product_id,
-                retailer=price_data["retailer"],
-                price=price_data["price"],
-                currency=price_data["currency"],
-                url=price_data.get("url", ""),
-            )
+        price_results = await scrape_product_prices(product)
+
+        # Save prices to database in one batched insert
+        await database.add_price_records(product_id, price_results)
     except Exception as e:
         # Log error but still redirect
         print(f"Error scraping product {product_id}: {e}")
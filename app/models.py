@@ -1,8 +1,80 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from dataclasses import dataclass, field
+from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import List, Optional
 from datetime import datetime
 
 
+@dataclass(slots=True)
+class ProductView:
+    """Read-only product shape for server-rendered pages.
+
+    A slots dataclass instead of a per-row dict: attribute access is a
+    fixed-offset read rather than a hash lookup, and each product carries
+    no per-instance dict. Jinja's product.name lookups work unchanged.
+    """
+    id: int
+    name: str
+    search_query: str
+    category: Optional[str]
+    region: Optional[str]
+    size: Optional[str]
+    color: Optional[str]
+    brand: Optional[str]
+    model: Optional[str]
+    storage: Optional[str]
+    material: Optional[str]
+    target_price: float
+    currency: Optional[str]
+    user_email: str
+    is_active: bool
+    created_at: datetime
+    lowest_price: Optional[float] = None
+    lowest_price_retailer: Optional[str] = None
+    lowest_price_url: Optional[str] = None
+    lowest_price_updated_at: Optional[datetime] = None
+    sources: List[dict] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ProductRow:
+    """Product row shape returned by get_all_products.
+
+    Scrape passes touch a handful of fields on every product of the
+    catalog; slot attribute access skips the per-field dict hashing of
+    plain row dicts. __getitem__/get keep dict-style call sites (and
+    asyncpg-Record-shaped code paths) working unchanged.
+    """
+    id: int
+    name: str
+    search_query: str
+    category: Optional[str]
+    region: Optional[str]
+    size: Optional[str]
+    color: Optional[str]
+    brand: Optional[str]
+    model: Optional[str]
+    storage: Optional[str]
+    material: Optional[str]
+    target_price: float
+    currency: Optional[str]
+    user_email: str
+    is_active: bool
+    created_at: datetime
+    lowest_price: Optional[float] = None
+    lowest_price_retailer: Optional[str] = None
+    lowest_price_url: Optional[str] = None
+    lowest_price_updated_at: Optional[datetime] = None
+    alert_recent: bool = False
+    # NULL lowest_price_updated_at yields SQL NULL, hence Optional
+    lowest_price_fresh: Optional[bool] = None
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+
 class ProductCreate(BaseModel):
     name: str
     search_query: str
@@ -23,18 +95,30 @@ class ProductUpdate(BaseModel):
 
 
 class Product(BaseModel):
+    # from_attributes lets the response models validate straight off
+    # ProductRow dataclasses without an intermediate dict copy
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     name: str
     search_query: str
-    size: Optional[str]
-    color: Optional[str]
+    category: Optional[str] = None
+    region: Optional[str] = None
+    size: Optional[str] = None
+    color: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    storage: Optional[str] = None
+    material: Optional[str] = None
     target_price: float
+    currency: Optional[str] = None
     user_email: str
     is_active: bool
     created_at: datetime
     lowest_price: Optional[float] = None
     lowest_price_retailer: Optional[str] = None
     lowest_price_url: Optional[str] = None
+    lowest_price_updated_at: Optional[datetime] = None
 
 
 class PriceRecord(BaseModel):
@@ -47,6 +131,10 @@ class PriceRecord(BaseModel):
     scraped_at: datetime
 
 
+class ProductDetail(Product):
+    current_prices: List[PriceRecord] = []
+
+
 class AlertRecord(BaseModel):
     id: int
     product_id: int
@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 from typing import List
 from .. import database
@@ -15,7 +17,8 @@ async def get_price_history(product_id: int, limit: int = 50):
         raise HTTPException(status_code=404, detail="Product not found")
 
     history = await database.get_price_history(product_id, limit=limit)
-    return history
+    # Records aren't JSON-serializable; convert at the response boundary only
+    return [dict(row) for row in history]
 
 
 @router.get("/{product_id}/latest")
@@ -26,7 +29,7 @@ async def get_latest_prices(product_id: int):
         raise HTTPException(status_code=404, detail="Product not found")
 
     prices = await database.get_latest_prices(product_id)
-    return prices
+    return [dict(row) for row in prices]
 
 
 @router.post("/{product_id}/scrape")
@@ -37,33 +40,16 @@ async def scrape_product(product_id: int):
         raise HTTPException(status_code=404, detail="Product not found")
 
     # Scrape prices with all product attributes
-    prices = await scrape_product_prices(
-        product_id=product_id,
-        search_query=product["search_query"],
-        region=product.get("region", "eu"),
-        size=product.get("size"),
-        color=product.get("color"),
-        brand=product.get("brand"),
-        model=product.get("model"),
-        storage=product.get("storage"),
-        material=product.get("material"),
-    )
+    prices = await scrape_product_prices(product)
 
     if not prices:
         return {"message": "No prices found", "prices": []}
 
-    # Store prices in database
-    for price_data in prices:
-        await database.add_price_record(
-            product_id=product_id,
-            retailer=price_data["retailer"],
-            price=price_data["price"],
-            url=price_data["url"],
-            currency=price_data.get("currency", "EUR"),
-        )
+    # Store all prices in one batched insert; it also hands back the
+    # cheapest row so we don't iterate the batch a second time
+    lowest = await database.add_price_records(product_id, prices)
 
     # Check for alerts
-    lowest = min(prices, key=lambda x: x["price"])
     alert_sent = await check_and_send_alert(
         product=product,
         lowest_price=lowest["price"],
@@ -78,59 +64,73 @@ async def scrape_product(product_id: int):
     }
 
 
+# Cap on concurrent scrapes so a large catalog doesn't flood SerpAPI
+SCRAPE_CONCURRENCY = 8
+
+
+async def _scrape_one(product: dict, semaphore: asyncio.Semaphore) -> dict:
+    """Scrape a single product, returning its prices (or the error)."""
+    async with semaphore:
+        try:
+            prices = await scrape_product_prices(product)
+            return {"product": product, "prices": prices}
+        except Exception as e:
+            return {"product": product, "error": str(e)}
+
+
 @router.post("/scrape-all")
 async def scrape_all_products():
     """Trigger a price scrape for all active products."""
     products = await database.get_all_products(active_only=True)
 
-    results = []
-    for product in products:
-        try:
-            prices = await scrape_product_prices(
-                product_id=product["id"],
-                search_query=product["search_query"],
-                region=product.get("region", "eu"),
-                size=product.get("size"),
-                color=product.get("color"),
-                brand=product.get("brand"),
-                model=product.get("model"),
-                storage=product.get("storage"),
-                material=product.get("material"),
-            )
-
-            for price_data in prices:
-                await database.add_price_record(
-                    product_id=product["id"],
-                    retailer=price_data["retailer"],
-                    price=price_data["price"],
-                    url=price_data["url"],
-                    currency=price_data.get("currency", "EUR"),
-                )
-
-            # Check for alerts
-            if prices:
-                lowest = min(prices, key=lambda x: x["price"])
-                alert_sent = await check_and_send_alert(
-                    product=product,
-                    lowest_price=lowest["price"],
-                    retailer=lowest["retailer"],
-                    url=lowest["url"],
-                )
-            else:
-                alert_sent = False
+    # Scraping is network-bound, so run products concurrently instead of
+    # paying each SerpAPI round-trip in sequence
+    semaphore = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+    scraped = await asyncio.gather(
+        *(_scrape_one(product, semaphore) for product in products)
+    )
 
-            results.append({
-                "product_id": product["id"],
-                "product_name": product["name"],
-                "prices_found": len(prices),
-                "alert_sent": alert_sent,
-            })
+    # Ingest the whole batch with one set-based, deduplicating insert
+    # instead of a transaction per product; scrape-all across a full
+    # catalog can land hundreds of rows
+    rows = []
+    for item in scraped:
+        for r in item.get("prices") or []:
+            rows.append((
+                item["product"]["id"],
+                r["retailer"],
+                r["price"],
+                r.get("currency", "EUR"),
+                r.get("url", ""),
+            ))
+    await database.bulk_add_price_records(rows)
 
-        except Exception as e:
+    results = []
+    for item in scraped:
+        product = item["product"]
+        if "error" in item:
             results.append({
                 "product_id": product["id"],
                 "product_name": product["name"],
-                "error": str(e),
+                "error": item["error"],
             })
+            continue
+
+        prices = item["prices"]
+        alert_sent = False
+        if prices:
+            lowest = min(prices, key=lambda x: x["price"])
+            alert_sent = await check_and_send_alert(
+                product=product,
+                lowest_price=lowest["price"],
+                retailer=lowest["retailer"],
+                url=lowest["url"],
+            )
+        results.append({
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "prices_found": len(prices),
+            "alert_sent": alert_sent,
+        })
 
     return {"results": results}
@@ -1,12 +1,26 @@
-from fastapi import APIRouter, HTTPException, Form, Request
+import asyncio
+import hashlib
+
+from dataclasses import asdict, dataclass
+from fastapi import APIRouter, Depends, HTTPException, Form, Request
 from fastapi.responses import RedirectResponse
 from typing import Optional
 from pydantic import BaseModel
 import httpx
+import orjson
 import re
-import json
+import time
+from selectolax.parser import HTMLParser
+from urllib.parse import urlparse
+
 from .. import database
-from ..models import ProductCreate, ProductUpdate
+from ..models import Product, ProductCreate, ProductDetail, ProductUpdate
+from ..services.scraper import extract_price
+
+
+def get_http(request: Request) -> httpx.AsyncClient:
+    """Dependency returning the app-wide shared HTTP client."""
+    return request.app.state.http
 
 
 class UrlScrapeRequest(BaseModel):
@@ -25,8 +39,231 @@ class ScrapedProductData(BaseModel):
     price: Optional[float] = None
     search_query: Optional[str] = None
 
+
+@dataclass(slots=True)
+class _ScratchProduct:
+    """Mutable scratch space for extract_product_data.
+
+    Extraction writes fields many times while trying strategies; slot
+    stores keep that free of Pydantic's per-assignment machinery, and the
+    public ScrapedProductData is built once at the return boundary.
+    """
+    name: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    color: Optional[str] = None
+    size: Optional[str] = None
+    storage: Optional[str] = None
+    material: Optional[str] = None
+    price: Optional[float] = None
+    search_query: Optional[str] = None
+
 router = APIRouter(prefix="/api/products", tags=["products"])
 
+# Download cap for scraped pages; metadata sits well within this
+MAX_FETCH_BYTES = 512 * 1024
+
+# Users paste the same URL repeatedly while tweaking the add-product
+# form, and a page's metadata barely changes minute to minute, so scrape
+# results are cached in-process keyed on (url, category) -- same pattern
+# as the home-page cache in database.py. Failures are cached briefly too
+# so a broken URL isn't re-fetched on every form keystroke.
+_SCRAPE_CACHE_TTL = 600.0
+_SCRAPE_FAILURE_TTL = 60.0
+_SCRAPE_CACHE_MAX = 256
+_scrape_cache: dict = {}
+
+# Second-level extraction cache keyed on page-content hash: URLs that
+# differ only in tracking parameters often serve byte-identical HTML,
+# and a refetch of an unchanged page (no validators) still hits here.
+# No TTL needed -- identical bytes always extract identically.
+_EXTRACT_CACHE_MAX = 256
+_extract_cache: dict = {}
+
+# Validators for conditional refetches, kept past the result TTL: when a
+# cached result expires we revalidate with If-None-Match/If-Modified-
+# Since, and a 304 lets us reuse the stored extraction with no body
+# transfer or re-parse at all.
+_scrape_validators: dict = {}
+
+
+def _scrape_cache_put(key, value, ttl: float):
+    if len(_scrape_cache) >= _SCRAPE_CACHE_MAX:
+        now = time.monotonic()
+        for k in [k for k, (exp, _) in _scrape_cache.items() if exp < now]:
+            del _scrape_cache[k]
+        while len(_scrape_cache) >= _SCRAPE_CACHE_MAX:
+            # dicts iterate in insertion order, so this drops the oldest
+            del _scrape_cache[next(iter(_scrape_cache))]
+    _scrape_cache[key] = (time.monotonic() + ttl, value)
+
+
+# Response cache for the product read endpoints. Product rows change
+# rarely; mutations in this router invalidate directly, while price
+# writes landing through the scrape endpoints are covered by the short
+# TTL. (A Redis/ETag layer only pays off with multiple workers.)
+_PRODUCT_RESPONSE_TTL = 60.0
+_product_response_cache: dict = {}
+
+
+def _response_cache_get(key: str):
+    cached = _product_response_cache.get(key)
+    if cached:
+        expires, value = cached
+        if time.monotonic() < expires:
+            return value
+        del _product_response_cache[key]
+    return None
+
+
+def _invalidate_product_responses(product_id: Optional[int] = None):
+    _product_response_cache.pop("products:True", None)
+    _product_response_cache.pop("products:False", None)
+    if product_id is not None:
+        _product_response_cache.pop(f"product:{product_id}", None)
+
+# Meta tags worth pulling from the parsed DOM: property/name -> result key
+META_KEYS = {
+    'og:title': 'og_title',
+    'og:description': 'og_description',
+    'product:price:amount': 'price',
+    'product:price:currency': 'currency',
+    'product:brand': 'brand',
+    'product:color': 'color',
+    'twitter:title': 'twitter_title',
+}
+
+SUFFIX_RE = re.compile(
+    r'\s*[-|–—:]\s*(Amazon|eBay|Best Buy|Walmart|Target|Official|Shop|Store|Buy).*$',
+    re.IGNORECASE,
+)
+PIPE_SUFFIX_RE = re.compile(r'\s*\|\s*.*$')
+
+COLOR_WORD_RE = re.compile(
+    r'\b(Black|White|Red|Blue|Green|Navy|Grey|Gray|Brown|Beige|Pink|Orange|Yellow|Purple|Gold|Silver)\b',
+    re.IGNORECASE,
+)
+
+STORAGE_RE = re.compile(r'\b(\d+)\s*(GB|TB)\b', re.IGNORECASE)
+
+# Strategy-3 fallback patterns, fused into one alternation so a single
+# finditer pass over the HTML collects candidates for every still-missing
+# field instead of re-scanning the full page once per pattern. Within the
+# combined scan the earliest occurrence in the page wins for each field.
+_FALLBACK_PATTERNS = {
+    "brand": [
+        r'"brand"\s*:\s*\{[^}]*"name"\s*:\s*"([^"]+)"',
+        r'"brand"\s*:\s*"([^"]+)"',
+        r'itemprop=["\']brand["\']\s+content=["\']([^"\']+)["\']',
+        r'data-brand=["\']([^"\']+)["\']',
+    ],
+    "price": [
+        r'"price"\s*:\s*"?(\d+\.?\d*)"?',
+        r'data-price=["\'](\d+\.?\d*)["\']',
+        # The gap between the price-class tag and the amount is bounded:
+        # an unbounded lazy [\s\S]*? here can backtrack across the whole
+        # page on adversarial or minified HTML (Python's re is a
+        # backtracking NFA, not a linear-time DFA)
+        r'class=["\'][^"\']*price[^"\']*["\'][^>]*>[\s\S]{0,200}?[\$€£]?\s*(\d+[,.]?\d*)',
+    ],
+    "model": [
+        r'"model"\s*:\s*"([^"]+)"',
+        r'"mpn"\s*:\s*"([^"]+)"',
+        r'"sku"\s*:\s*"([^"]+)"',
+        r'Model[\s:#]+([A-Z0-9][-A-Z0-9/]+)',
+    ],
+    "material": [
+        r'"material"\s*:\s*"([^"]+)"',
+        r'(\d+%\s*(?:Cotton|Polyester|Wool|Silk|Linen|Nylon|Spandex|Elastane|Viscose|Rayon)[^<\n]*)',
+        r'Material[:\s]+([A-Za-z0-9%\s,]+?)(?:\.|<|$)',
+    ],
+}
+
+FALLBACK_RE = re.compile(
+    "|".join(
+        f"(?P<{field}_{i}>{pattern})"
+        for field, patterns in _FALLBACK_PATTERNS.items()
+        for i, pattern in enumerate(patterns)
+    ),
+    re.IGNORECASE,
+)
+
+# Each alternative carries exactly one inner capture group holding the
+# value, at the index right after its named wrapper group
+_FALLBACK_VALUE_GROUP = {
+    name: index + 1 for name, index in FALLBACK_RE.groupindex.items()
+}
+
+# Cheap substring anchors, checked against the lowercased page before a
+# field joins the regex scan: str.__contains__ is C-level and orders of
+# magnitude cheaper than invoking the regex engine for a pattern whose
+# literal anchor isn't in the page at all
+_FALLBACK_ANCHORS = {
+    "brand": ("brand",),
+    "price": ("price",),
+    "model": ("model", "mpn", "sku"),
+    "material": ("material", "%"),
+}
+
+
+def _norm_price(value: str) -> Optional[float]:
+    try:
+        price = float(value.replace(',', '.'))
+    except ValueError:
+        return None
+    return price if 0.01 < price < 100000 else None  # Sanity check
+
+
+# Same sanity checks the per-pattern loops applied before accepting a hit
+_FALLBACK_NORMALIZERS = {
+    "brand": lambda v: v if 1 < len(v) < 50 else None,
+    "price": _norm_price,
+    "model": lambda v: v if 2 < len(v) < 50 else None,
+    "material": lambda v: v if 3 < len(v) < 150 else None,
+}
+
+
+def _scan_fallback_fields(html: str, needed: set) -> dict:
+    """One pass over the HTML collecting the first valid hit per field."""
+    found: dict = {}
+    for m in FALLBACK_RE.finditer(html):
+        field = m.lastgroup.rsplit("_", 1)[0]
+        if field in needed and field not in found:
+            raw = m.group(_FALLBACK_VALUE_GROUP[m.lastgroup]).strip()
+            value = _FALLBACK_NORMALIZERS[field](raw)
+            if value is not None:
+                found[field] = value
+                if len(found) == len(needed):
+                    break
+    return found
+
+# Deliberately case-sensitive, as before: [Cc]olou?r avoids matching
+# attribute names like "COLOR" inside minified JS. Each pattern carries
+# a lowercase anchor literal for the same pre-check as the fused scan.
+COLOR_PATTERNS = [
+    (anchor, re.compile(p))
+    for anchor, p in [
+        ('"color"', r'"color"\s*:\s*"([^"]+)"'),
+        ('data-color', r'data-color=["\']([^"\']+)["\']'),
+        ('colo', r'[Cc]olou?r[:\s]+([A-Za-z\s]+?)(?:\s*[,.<]|$)'),
+    ]
+]
+
+DIGIT_RE = re.compile(r'\d')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Bot-queue / interstitial markers fused into one case-insensitive
+# alternation: a single automaton pass over the raw bytes replaces five
+# separate substring scans and the html.lower() copy they required
+QUEUE_RE = re.compile(
+    r"we should be up and moving shortly"
+    r"|please wait"
+    r"|queue"
+    r"|high traffic"
+    r"|checking your browser",
+    re.IGNORECASE,
+)
+
 
 @router.post("")
 async def create_product(product: ProductCreate):
@@ -39,42 +276,55 @@ async def create_product(product: ProductCreate):
         size=product.size,
         color=product.color,
     )
+    _invalidate_product_responses()
     return {"id": product_id, "message": "Product created successfully"}
 
 
-@router.get("")
+@router.get("", response_model=list[Product])
 async def list_products(active_only: bool = False):
     """List all tracked products."""
-    products = await database.get_all_products(active_only=active_only)
-
-    # Enrich with lowest prices
-    for product in products:
-        lowest = await database.get_lowest_price(product["id"])
-        if lowest:
-            product["lowest_price"] = lowest["price"]
-            product["lowest_price_retailer"] = lowest["retailer"]
-            product["lowest_price_url"] = lowest["url"]
+    cache_key = f"products:{active_only}"
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        return cached
 
+    # The lowest_price* cache columns ride along on the product rows, so
+    # no per-product price lookup is needed here
+    products = await database.get_all_products(active_only=active_only)
+    _product_response_cache[cache_key] = (
+        time.monotonic() + _PRODUCT_RESPONSE_TTL, products
+    )
     return products
 
 
-@router.get("/{product_id}")
+@router.get("/{product_id}", response_model=ProductDetail)
 async def get_product(product_id: int):
     """Get a specific product by ID."""
-    product = await database.get_product(product_id)
-    if not product:
+    cache_key = f"product:{product_id}"
+    cached = _response_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    record = await database.get_product(product_id)
+    if not record:
         raise HTTPException(status_code=404, detail="Product not found")
+    product = dict(record)
 
-    # Add price info
-    lowest = await database.get_lowest_price(product_id)
-    if lowest:
+    # One latest-per-retailer query serves both the price list and the
+    # lowest-price summary: rows come back price-sorted, so the first row
+    # is the cheapest current offer
+    latest_prices = await database.get_latest_prices(product_id)
+    if latest_prices:
+        lowest = latest_prices[0]
         product["lowest_price"] = lowest["price"]
         product["lowest_price_retailer"] = lowest["retailer"]
         product["lowest_price_url"] = lowest["url"]
 
-    latest_prices = await database.get_latest_prices(product_id)
-    product["current_prices"] = latest_prices
+    product["current_prices"] = [dict(row) for row in latest_prices]
 
+    _product_response_cache[cache_key] = (
+        time.monotonic() + _PRODUCT_RESPONSE_TTL, product
+    )
     return product
 
 
@@ -89,6 +339,7 @@ async def update_product(product_id: int, product: ProductUpdate):
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
 
+    _invalidate_product_responses(product_id)
     return {"message": "Product updated successfully"}
 
 
@@ -99,138 +350,212 @@ async def delete_product(product_id: int):
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
 
+    _invalidate_product_responses(product_id)
     return {"message": "Product deleted successfully"}
 
 
 @router.post("/{product_id}/toggle")
 async def toggle_product(product_id: int):
     """Toggle a product's active status."""
-    product = await database.get_product(product_id)
-    if not product:
+    new_status = await database.toggle_product_active(product_id)
+    if new_status is None:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    new_status = not product["is_active"]
-    await database.update_product(product_id, is_active=new_status)
-
+    _invalidate_product_responses(product_id)
     return {"message": f"Product {'activated' if new_status else 'deactivated'}", "is_active": new_status}
 
 
 @router.post("/scrape-url")
-async def scrape_product_url(request: UrlScrapeRequest):
+async def scrape_product_url(
+    request: UrlScrapeRequest,
+    client: httpx.AsyncClient = Depends(get_http),
+):
     """Scrape product details from a URL to prefill the form."""
     url = request.url
     category = request.category
 
     if not url:
         raise HTTPException(status_code=400, detail="URL is required")
+    if not url.startswith(("http://", "https://")):
+        raise HTTPException(status_code=400, detail="URL must use http or https")
+
+    cache_key = (url, category)
+    cached = _scrape_cache.get(cache_key)
+    if cached:
+        expires, value = cached
+        if time.monotonic() < expires:
+            if isinstance(value, HTTPException):
+                raise value
+            return value
+        del _scrape_cache[cache_key]
+
+    stale = _scrape_validators.get(cache_key)
+    conditional_headers = {}
+    if stale:
+        etag, last_modified, _ = stale
+        if etag:
+            conditional_headers["If-None-Match"] = etag
+        if last_modified:
+            conditional_headers["If-Modified-Since"] = last_modified
 
     try:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=15.0) as client:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5",
-            }
-            response = await client.get(url, headers=headers)
+        # The shared client carries browser-like headers and keeps
+        # connections to repeat hosts alive across requests. Stream the
+        # body and stop at the cap: everything extractable lives in the
+        # head and top of body, so multi-MB product pages don't need to
+        # be downloaded (or regexed) in full.
+        async with client.stream("GET", url, headers=conditional_headers or None) as response:
+            if response.status_code == 304 and stale:
+                # Page unchanged since last extraction; refresh the
+                # result cache from the stored data
+                data = stale[2]
+                _scrape_cache_put(cache_key, data, _SCRAPE_CACHE_TTL)
+                return data
             response.raise_for_status()
-            html = response.text
+            # Headers are in before any body bytes: bail out on PDFs,
+            # images, videos etc. without downloading them
+            ctype = response.headers.get("content-type", "")
+            media_type = ctype.split(";", 1)[0].strip().lower()
+            if media_type and media_type not in ("text/html", "application/xhtml+xml"):
+                exc = HTTPException(status_code=415, detail="URL does not point to an HTML page")
+                _scrape_cache_put(cache_key, exc, _SCRAPE_FAILURE_TTL)
+                raise exc
+            buf = bytearray()
+            async for chunk in response.aiter_bytes():
+                buf += chunk
+                if len(buf) >= MAX_FETCH_BYTES:
+                    break
+        html = buf.decode(response.charset_encoding or "utf-8", errors="replace")
+    except HTTPException:
+        raise
     except httpx.TimeoutException:
-        raise HTTPException(status_code=408, detail="Request timed out while fetching the URL")
+        exc = HTTPException(status_code=408, detail="Request timed out while fetching the URL")
+        _scrape_cache_put(cache_key, exc, _SCRAPE_FAILURE_TTL)
+        raise exc
     except httpx.HTTPStatusError as e:
-        raise HTTPException(status_code=e.response.status_code, detail=f"Failed to fetch URL: {e.response.status_code}")
+        exc = HTTPException(status_code=e.response.status_code, detail=f"Failed to fetch URL: {e.response.status_code}")
+        _scrape_cache_put(cache_key, exc, _SCRAPE_FAILURE_TTL)
+        raise exc
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch URL: {str(e)}")
+        exc = HTTPException(status_code=500, detail=f"Failed to fetch URL: {str(e)}")
+        _scrape_cache_put(cache_key, exc, _SCRAPE_FAILURE_TTL)
+        raise exc
+
+    # Extraction is CPU-bound (C parse plus regex fallbacks over up to
+    # 512 KB); run it on the default thread pool so concurrent requests
+    # aren't stalled behind it on the event loop
+    data = await asyncio.get_running_loop().run_in_executor(
+        None, _extract_product_data_cached, html, category, _host_token(url)
+    )
 
-    # Extract product data from HTML
-    data = extract_product_data(html, category)
+    _scrape_cache_put(cache_key, data, _SCRAPE_CACHE_TTL)
+
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if etag or last_modified:
+        _scrape_validators[cache_key] = (etag, last_modified, data)
+        while len(_scrape_validators) > _SCRAPE_CACHE_MAX:
+            del _scrape_validators[next(iter(_scrape_validators))]
 
     return data
 
 
-def extract_json_ld(html: str) -> list[dict]:
-    """Extract all JSON-LD structured data from HTML."""
-    json_ld_data = []
-    pattern = r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>'
-    matches = re.findall(pattern, html, re.DOTALL | re.IGNORECASE)
+def _extract_product_data_cached(
+    html: str, category: str, host: Optional[str] = None
+) -> ScrapedProductData:
+    """Extraction front-end that short-circuits on identical page bytes."""
+    digest = hashlib.blake2b(html.encode(), digest_size=16).digest()
+    key = (digest, category, host)
+    cached = _extract_cache.get(key)
+    if cached is not None:
+        return cached
+    data = None
+    extractor = _RETAILER_EXTRACTORS.get(host) if host else None
+    if extractor is not None and not QUEUE_RE.search(html):
+        scratch = extractor(HTMLParser(html))
+        # Only trust the fast path when it got the essentials; a partial
+        # hit still goes through the generic cascade
+        if scratch is not None and scratch.name and scratch.price:
+            _fill_search_query(scratch)
+            data = ScrapedProductData(**asdict(scratch))
+    if data is None:
+        data = extract_product_data(html, category)
+    if len(_extract_cache) >= _EXTRACT_CACHE_MAX:
+        del _extract_cache[next(iter(_extract_cache))]
+    _extract_cache[key] = data
+    return data
+
 
-    for match in matches:
+def extract_json_ld(tree: HTMLParser) -> list[dict]:
+    """Extract all JSON-LD structured data from the parsed DOM."""
+    json_ld_data = []
+    for node in tree.css('script[type="application/ld+json"]'):
+        text = node.text()
+        if not text:
+            continue
         try:
-            data = json.loads(match.strip())
-            if isinstance(data, list):
-                json_ld_data.extend(data)
-            else:
-                json_ld_data.append(data)
-        except json.JSONDecodeError:
+            data = orjson.loads(text)
+        except orjson.JSONDecodeError:
             continue
+        if isinstance(data, list):
+            json_ld_data.extend(data)
+        else:
+            json_ld_data.append(data)
 
     return json_ld_data
 
 
-def extract_meta_tags(html: str) -> dict:
-    """Extract Open Graph and other meta tags."""
+def extract_meta_tags(tree: HTMLParser) -> dict:
+    """Extract Open Graph and other meta tags from the parsed DOM.
+
+    CSS lookups against the C-parsed tree replace the previous per-tag
+    regex scans and handle attribute ordering/quoting variants for free.
+    """
     meta = {}
 
-    # Open Graph tags (property attribute)
-    og_patterns = [
-        (r'<meta\s+property=["\']og:title["\']\s+content=["\']([^"\']+)["\']', 'og_title'),
-        (r'<meta\s+content=["\']([^"\']+)["\']\s+property=["\']og:title["\']', 'og_title'),
-        (r'<meta\s+property=["\']og:description["\']\s+content=["\']([^"\']+)["\']', 'og_description'),
-        (r'<meta\s+content=["\']([^"\']+)["\']\s+property=["\']og:description["\']', 'og_description'),
-        (r'<meta\s+property=["\']product:price:amount["\']\s+content=["\']([^"\']+)["\']', 'price'),
-        (r'<meta\s+content=["\']([^"\']+)["\']\s+property=["\']product:price:amount["\']', 'price'),
-        (r'<meta\s+property=["\']product:price:currency["\']\s+content=["\']([^"\']+)["\']', 'currency'),
-        (r'<meta\s+property=["\']product:brand["\']\s+content=["\']([^"\']+)["\']', 'brand'),
-        (r'<meta\s+content=["\']([^"\']+)["\']\s+property=["\']product:brand["\']', 'brand'),
-        (r'<meta\s+property=["\']product:color["\']\s+content=["\']([^"\']+)["\']', 'color'),
-        (r'<meta\s+content=["\']([^"\']+)["\']\s+property=["\']product:color["\']', 'color'),
-    ]
+    # One walk over the meta nodes buckets every wanted tag at once,
+    # instead of a separate tree query per property
+    for node in tree.css('meta'):
+        attrs = node.attributes
+        key = META_KEYS.get(attrs.get('property') or attrs.get('name'))
+        if key and key not in meta:
+            content = attrs.get('content')
+            if content:
+                meta[key] = content.strip()
 
-    for pattern, key in og_patterns:
-        if key not in meta:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                meta[key] = match.group(1).strip()
+    # Regular title
+    node = tree.css_first('title')
+    if node:
+        title = node.text()
+        if title:
+            meta['title'] = title.strip()
 
-    # Twitter cards
-    twitter_patterns = [
-        (r'<meta\s+name=["\']twitter:title["\']\s+content=["\']([^"\']+)["\']', 'twitter_title'),
-        (r'<meta\s+content=["\']([^"\']+)["\']\s+name=["\']twitter:title["\']', 'twitter_title'),
-    ]
+    return meta
 
-    for pattern, key in twitter_patterns:
-        if key not in meta:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                meta[key] = match.group(1).strip()
 
-    # Regular title
-    title_match = re.search(r'<title>([^<]+)</title>', html, re.IGNORECASE)
-    if title_match:
-        meta['title'] = title_match.group(1).strip()
+_PRODUCT_TYPES = frozenset(('Product', 'IndividualProduct', 'ProductModel'))
 
-    return meta
+
+def _walk_json_ld(obj):
+    """Yield every dict node in a JSON-LD value, descending into @graph."""
+    if isinstance(obj, dict):
+        yield obj
+        graph = obj.get('@graph')
+        if graph:
+            yield from _walk_json_ld(graph)
+    elif isinstance(obj, list):
+        for item in obj:
+            yield from _walk_json_ld(item)
 
 
 def find_product_in_json_ld(json_ld_list: list[dict]) -> dict | None:
     """Find Product schema in JSON-LD data."""
-    for item in json_ld_list:
-        if isinstance(item, dict):
-            item_type = item.get('@type', '')
-            if isinstance(item_type, list):
-                item_type = item_type[0] if item_type else ''
-
-            if item_type in ['Product', 'IndividualProduct', 'ProductModel']:
-                return item
-
-            # Check @graph array
-            if '@graph' in item:
-                for graph_item in item['@graph']:
-                    if isinstance(graph_item, dict):
-                        graph_type = graph_item.get('@type', '')
-                        if isinstance(graph_type, list):
-                            graph_type = graph_type[0] if graph_type else ''
-                        if graph_type in ['Product', 'IndividualProduct', 'ProductModel']:
-                            return graph_item
+    for node in _walk_json_ld(json_ld_list):
+        node_type = node.get('@type', '')
+        if isinstance(node_type, list):
+            node_type = node_type[0] if node_type else ''
+        if node_type in _PRODUCT_TYPES:
+            return node
     return None
 
 
@@ -239,25 +564,31 @@ def clean_product_name(name: str) -> str:
     if not name:
         return name
     # Remove common store suffixes
-    name = re.sub(r'\s*[-|–—:]\s*(Amazon|eBay|Best Buy|Walmart|Target|Official|Shop|Store|Buy).*$', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'\s*\|\s*.*$', '', name)  # Remove everything after |
+    name = SUFFIX_RE.sub('', name)
+    name = PIPE_SUFFIX_RE.sub('', name)  # Remove everything after |
     name = name.strip()
     return name
 
 
 def extract_product_data(html: str, category: str) -> ScrapedProductData:
     """Extract product information from HTML content using multiple strategies."""
-    data = ScrapedProductData()
+    data = _ScratchProduct()
 
     # Check if page seems to be a queue/waiting page
-    queue_indicators = ['we should be up and moving shortly', 'please wait', 'queue', 'high traffic', 'checking your browser']
-    html_lower = html.lower()
-    if any(indicator in html_lower for indicator in queue_indicators):
+    if QUEUE_RE.search(html):
         # Page is likely blocked/queued, return empty data
-        return data
+        return ScrapedProductData()
+
+    # Lowered copy for the cheap substring anchor checks below; built
+    # only after the queue gate so blocked pages never pay for it
+    html_lower = html.lower()
+
+    # One C-level parse of the page serves both the JSON-LD and the
+    # meta-tag strategies
+    tree = HTMLParser(html)
 
     # Strategy 1: JSON-LD structured data (most reliable)
-    json_ld_list = extract_json_ld(html)
+    json_ld_list = extract_json_ld(tree)
     product_ld = find_product_in_json_ld(json_ld_list)
 
     if product_ld:
@@ -313,12 +644,12 @@ def extract_product_data(html: str, category: str) -> ScrapedProductData:
 
         # Try to get color from description if not found
         if not data.color and description:
-            color_match = re.search(r'\b(Black|White|Red|Blue|Green|Navy|Grey|Gray|Brown|Beige|Pink|Orange|Yellow|Purple|Gold|Silver)\b', description, re.IGNORECASE)
+            color_match = COLOR_WORD_RE.search(description)
             if color_match:
                 data.color = color_match.group(1).title()
 
     # Strategy 2: Meta tags (fallback for missing fields)
-    meta = extract_meta_tags(html)
+    meta = extract_meta_tags(tree)
 
     if not data.name:
         data.name = clean_product_name(meta.get('og_title') or meta.get('twitter_title') or meta.get('title', ''))
@@ -337,102 +668,71 @@ def extract_product_data(html: str, category: str) -> ScrapedProductData:
             except ValueError:
                 pass
 
-    # Strategy 3: Regex patterns for common structures (last resort)
+    # Strategy 3: Regex patterns for common structures (last resort).
+    # Whatever is still missing is collected in one scan over the page.
+    needed = set()
     if not data.brand:
-        brand_patterns = [
-            r'"brand"\s*:\s*\{[^}]*"name"\s*:\s*"([^"]+)"',
-            r'"brand"\s*:\s*"([^"]+)"',
-            r'itemprop=["\']brand["\']\s+content=["\']([^"\']+)["\']',
-            r'data-brand=["\']([^"\']+)["\']',
-        ]
-        for pattern in brand_patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                brand = match.group(1).strip()
-                if len(brand) > 1 and len(brand) < 50:
-                    data.brand = brand
-                    break
-
+        needed.add("brand")
     if not data.price:
-        price_patterns = [
-            r'"price"\s*:\s*"?(\d+\.?\d*)"?',
-            r'data-price=["\'](\d+\.?\d*)["\']',
-            r'class=["\'][^"\']*price[^"\']*["\'][^>]*>[\s\S]*?[\$€£]?\s*(\d+[,.]?\d*)',
-        ]
-        for pattern in price_patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                try:
-                    price_str = match.group(1).replace(',', '.')
-                    price = float(price_str)
-                    if 0.01 < price < 100000:  # Sanity check
-                        data.price = price
-                        break
-                except ValueError:
-                    continue
+        needed.add("price")
+    if category == "electronics" and not data.model:
+        needed.add("model")
+    elif category == "clothes" and not data.material:
+        needed.add("material")
+
+    # Prune fields whose anchor literals don't occur anywhere in the page
+    needed = {
+        field for field in needed
+        if any(anchor in html_lower for anchor in _FALLBACK_ANCHORS[field])
+    }
+    if needed:
+        found = _scan_fallback_fields(html, needed)
+        data.brand = data.brand or found.get("brand")
+        data.price = data.price or found.get("price")
+        data.model = data.model or found.get("model")
+        data.material = data.material or found.get("material")
 
     # Category-specific extractions
-    if category == "electronics":
-        if not data.storage:
-            storage_match = re.search(r'\b(\d+)\s*(GB|TB)\b', html, re.IGNORECASE)
-            if storage_match:
-                data.storage = f"{storage_match.group(1)}{storage_match.group(2).upper()}"
-
-        if not data.model:
-            model_patterns = [
-                r'"model"\s*:\s*"([^"]+)"',
-                r'"mpn"\s*:\s*"([^"]+)"',
-                r'"sku"\s*:\s*"([^"]+)"',
-                r'Model[\s:#]+([A-Z0-9][-A-Z0-9/]+)',
-            ]
-            for pattern in model_patterns:
-                match = re.search(pattern, html, re.IGNORECASE)
-                if match:
-                    model = match.group(1).strip()
-                    if len(model) > 2 and len(model) < 50:
-                        data.model = model
-                        break
-
-    elif category == "clothes":
-        if not data.material:
-            material_patterns = [
-                r'"material"\s*:\s*"([^"]+)"',
-                r'(\d+%\s*(?:Cotton|Polyester|Wool|Silk|Linen|Nylon|Spandex|Elastane|Viscose|Rayon)[^<\n]*)',
-                r'Material[:\s]+([A-Za-z0-9%\s,]+?)(?:\.|<|$)',
-            ]
-            for pattern in material_patterns:
-                match = re.search(pattern, html, re.IGNORECASE)
-                if match:
-                    material = match.group(1).strip()
-                    if len(material) > 3 and len(material) < 150:
-                        data.material = material
-                        break
+    if (category == "electronics" and not data.storage
+            and ("gb" in html_lower or "tb" in html_lower)):
+        storage_match = STORAGE_RE.search(html)
+        if storage_match:
+            data.storage = f"{storage_match.group(1)}{storage_match.group(2).upper()}"
 
     # Extract color if still missing (common patterns)
     if not data.color:
-        color_patterns = [
-            r'"color"\s*:\s*"([^"]+)"',
-            r'data-color=["\']([^"\']+)["\']',
-            r'[Cc]olou?r[:\s]+([A-Za-z\s]+?)(?:\s*[,.<]|$)',
-        ]
-        for pattern in color_patterns:
-            match = re.search(pattern, html)
+        for anchor, rx in COLOR_PATTERNS:
+            if anchor not in html_lower:
+                continue
+            match = rx.search(html)
             if match:
                 color = match.group(1).strip()
-                if len(color) > 2 and len(color) < 40 and not re.search(r'\d', color):
+                if len(color) > 2 and len(color) < 40 and not DIGIT_RE.search(color):
                     data.color = color
                     break
 
     # Generate search query from extracted data
+    _fill_search_query(data)
+
+    return ScrapedProductData(**asdict(data))
+
+
+def _fill_search_query(data: _ScratchProduct) -> None:
+    """Assemble data.search_query from the extracted fields."""
     search_parts = []
     if data.brand:
         search_parts.append(data.brand)
     if data.name:
         name_for_search = data.name
-        # Remove brand from name if already included
-        if data.brand and data.brand.lower() in name_for_search.lower():
-            name_for_search = re.sub(re.escape(data.brand), '', name_for_search, flags=re.IGNORECASE).strip()
-        name_for_search = re.sub(r'\s+', ' ', name_for_search).strip()
+        # Remove brand from name if already included: case-insensitive
+        # literal removal via slicing, no per-request regex compilation
+        if data.brand:
+            i = name_for_search.lower().find(data.brand.lower())
+            if i != -1:
+                name_for_search = (
+                    name_for_search[:i] + name_for_search[i + len(data.brand):]
+                ).strip()
+        name_for_search = WHITESPACE_RE.sub(' ', name_for_search).strip()
         if name_for_search:
             search_parts.append(name_for_search)
     if data.model and data.model not in ' '.join(search_parts):
@@ -443,4 +743,66 @@ def extract_product_data(html: str, category: str) -> ScrapedProductData:
     if search_parts:
         data.search_query = ' '.join(search_parts)
 
+
+# -- Retailer-specific extractors -------------------------------------
+#
+# The big retailers have stable, well-known markup; when the URL's host
+# matches, a handful of direct CSS lookups replaces the whole generic
+# strategy cascade. Each extractor returns None when the expected
+# markup is absent (bot wall, layout change), which falls back to
+# extract_product_data.
+
+_AMAZON_BYLINE_RE = re.compile(r'(?:Visit the |Brand: )?(.+?)(?: Store)?$')
+
+
+def _extract_amazon(tree: HTMLParser) -> Optional[_ScratchProduct]:
+    title = tree.css_first('#productTitle')
+    if title is None:
+        return None
+    data = _ScratchProduct()
+    data.name = clean_product_name(WHITESPACE_RE.sub(' ', title.text()).strip())
+    price_node = (tree.css_first('.a-price .a-offscreen')
+                  or tree.css_first('#priceblock_ourprice'))
+    if price_node:
+        data.price = extract_price(price_node.text())
+    byline = tree.css_first('#bylineInfo')
+    if byline:
+        m = _AMAZON_BYLINE_RE.match(byline.text().strip())
+        if m:
+            data.brand = m.group(1)
     return data
+
+
+def _extract_ebay(tree: HTMLParser) -> Optional[_ScratchProduct]:
+    title = (tree.css_first('.x-item-title__mainTitle')
+             or tree.css_first('#itemTitle'))
+    if title is None:
+        return None
+    data = _ScratchProduct()
+    data.name = clean_product_name(WHITESPACE_RE.sub(' ', title.text()).strip())
+    price_node = (tree.css_first('.x-price-primary')
+                  or tree.css_first('#prcIsum'))
+    if price_node:
+        data.price = extract_price(price_node.text())
+    return data
+
+
+_RETAILER_EXTRACTORS = {
+    'amazon': _extract_amazon,
+    'ebay': _extract_ebay,
+}
+
+
+def _host_token(url: str) -> Optional[str]:
+    """Retailer token from the URL's host ('www.amazon.co.uk' -> 'amazon').
+
+    Matching any label against the dispatch table sidesteps multi-part
+    public suffixes like co.uk without a suffix list.
+    """
+    labels = urlparse(url).netloc.lower().split('.')
+    for label in labels:
+        if label in _RETAILER_EXTRACTORS:
+            return label
+    if len(labels) >= 2:
+        return labels[-2]
+    return labels[0] or None
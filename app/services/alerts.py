@@ -1,37 +1,14 @@
+import asyncio
+
 import resend
 from typing import Optional
-from ..config import get_settings
-
-
-def send_price_alert(
-    to_email: str,
-    product_name: str,
-    current_price: float,
-    target_price: float,
-    retailer: str,
-    product_url: str,
-    currency: str = "USD"
-) -> Optional[str]:
-    """
-    Send a price drop alert email.
-
-    Returns the email ID if successful, None otherwise.
-    """
-    settings = get_settings()
-
-    if not settings.resend_api_key:
-        raise ValueError("RESEND_API_KEY not configured")
+from ..config import Settings, get_settings
 
-    resend.api_key = settings.resend_api_key
 
-    # Format prices
-    currency_symbol = "$" if currency == "USD" else currency
-    current_formatted = f"{currency_symbol}{current_price:.2f}"
-    target_formatted = f"{currency_symbol}{target_price:.2f}"
-    savings = target_price - current_price
-    savings_formatted = f"{currency_symbol}{savings:.2f}"
-
-    html_content = f"""
+# Email bodies as module-level templates rather than f-string literals
+# assembled inside every send; the CSS never changes, so build it once
+# and fill in only the per-alert fields with .format()
+_HTML_TEMPLATE = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -70,9 +47,9 @@ def send_price_alert(
         </div>
     </body>
     </html>
-    """
+"""
 
-    text_content = f"""
+_TEXT_TEMPLATE = """
     Price Drop Alert!
 
     {product_name}
@@ -85,7 +62,55 @@ def send_price_alert(
 
     ---
     You're receiving this because you set up a price alert on PriceSpy.
+"""
+
+
+def send_price_alert(
+    to_email: str,
+    product_name: str,
+    current_price: float,
+    target_price: float,
+    retailer: str,
+    product_url: str,
+    currency: str = "USD",
+    settings: Optional[Settings] = None,
+) -> Optional[str]:
     """
+    Send a price drop alert email.
+
+    Returns the email ID if successful, None otherwise.
+    """
+    if settings is None:
+        settings = get_settings()
+
+    if not settings.resend_api_key:
+        raise ValueError("RESEND_API_KEY not configured")
+
+    resend.api_key = settings.resend_api_key
+
+    # Format prices
+    currency_symbol = "$" if currency == "USD" else currency
+    current_formatted = f"{currency_symbol}{current_price:.2f}"
+    target_formatted = f"{currency_symbol}{target_price:.2f}"
+    savings = target_price - current_price
+    savings_formatted = f"{currency_symbol}{savings:.2f}"
+
+    html_content = _HTML_TEMPLATE.format(
+        product_name=product_name,
+        retailer=retailer,
+        current_formatted=current_formatted,
+        target_formatted=target_formatted,
+        savings_formatted=savings_formatted,
+        product_url=product_url,
+    )
+    text_content = _TEXT_TEMPLATE.format(
+        product_name=product_name,
+        retailer=retailer,
+        current_formatted=current_formatted,
+        target_formatted=target_formatted,
+        savings_formatted=savings_formatted,
+        product_url=product_url,
+    )
 
     try:
         response = resend.Emails.send({
@@ -105,32 +130,44 @@ async def check_and_send_alert(
     product: dict,
     lowest_price: float,
     retailer: str,
-    url: str
+    url: str,
+    settings: Optional[Settings] = None,
 ) -> bool:
     """
     Check if price is below target and send alert if not sent recently.
 
-    Returns True if alert was sent.
+    Rows from get_all_products carry the cooldown state preloaded as
+    alert_recent; only products fetched without it (get_product) cost a
+    lookup here. Returns True if alert was sent.
     """
     from .. import database
 
-    # Check if price is below target
-    if lowest_price >= product["target_price"]:
+    # Compare in integer cents: prices arrive through float parsing and
+    # REAL columns, and a drop of exactly one cent can otherwise sit on
+    # the wrong side of a float comparison (e.g. 19.99 stored as
+    # 19.990000000000002)
+    if round(lowest_price * 100) >= round(product["target_price"] * 100):
         return False
 
     # Check if we already sent an alert recently (within 24 hours)
-    recent_alert = await database.get_recent_alert(product["id"], hours=24)
-    if recent_alert:
+    alert_recent = product.get("alert_recent")
+    if alert_recent is None:
+        alert_recent = bool(await database.get_recent_alert(product["id"], hours=24))
+    if alert_recent:
         return False
 
-    # Send the alert
-    email_id = send_price_alert(
+    # Send the alert off the event loop: resend.Emails.send is a
+    # blocking HTTP call and would otherwise stall every other
+    # in-flight scrape for the duration of the round-trip
+    email_id = await asyncio.to_thread(
+        send_price_alert,
         to_email=product["user_email"],
         product_name=product["name"],
         current_price=lowest_price,
         target_price=product["target_price"],
         retailer=retailer,
         product_url=url,
+        settings=settings,
     )
 
     if email_id:
@@ -1,7 +1,33 @@
-from serpapi import GoogleSearch
+import httpx
+import orjson
+
 from typing import List, Optional
-from ..config import get_settings
-import re
+from ..config import Settings, get_settings
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# Lazily-built shared client for SerpAPI calls: keep-alive pooling
+# across scrapes without requiring every caller to thread one through.
+# The app's lifespan (and the standalone scraper script) close it via
+# close_client().
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=15.0,
+            limits=httpx.Limits(max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 # Region configuration for SerpAPI
@@ -28,25 +54,42 @@ REGION_CONFIG = {
 
 
 def extract_price(price_str: str) -> Optional[float]:
-    """Extract numeric price from a string like '$99.99', '99,99 EUR', or '29 999 Ft'."""
+    """Extract numeric price from a string like '$99.99', '99,99 EUR', or '29 999 Ft'.
+
+    One hand-rolled pass over the characters: this runs for every
+    shopping result of every scrape, and the regex pipeline it replaces
+    allocated three intermediate strings per call.
+    """
     if not price_str:
         return None
-    # Remove currency symbols and normalize
-    cleaned = price_str.replace(',', '.').replace(' ', '')
-    # Remove common currency symbols
-    cleaned = re.sub(r'[€$£¥₹Ft]', '', cleaned)
-    cleaned = re.sub(r'EUR|USD|GBP|HUF', '', cleaned)
-    # Extract number
-    numbers = re.findall(r'[\d]+\.?\d*', cleaned)
-    if numbers:
-        try:
-            return float(numbers[0])
-        except ValueError:
-            return None
-    return None
-
-
-def search_google_shopping(
+    int_part = 0
+    frac = 0
+    frac_div = 1
+    seen_digit = False
+    in_frac = False
+    for ch in price_str:
+        if '0' <= ch <= '9':
+            seen_digit = True
+            if in_frac:
+                frac = frac * 10 + (ord(ch) - 48)
+                frac_div *= 10
+            else:
+                int_part = int_part * 10 + (ord(ch) - 48)
+        elif ch == ' ' or ch == '\xa0':
+            # Thousands grouping as in '29 999 Ft'; skipped mid-number
+            continue
+        elif (ch == '.' or ch == ',') and seen_digit:
+            if in_frac:
+                break
+            in_frac = True
+        elif seen_digit:
+            break
+    if not seen_digit:
+        return None
+    return int_part + frac / frac_div if in_frac else float(int_part)
+
+
+async def search_google_shopping(
     query: str,
     region: str = "eu",
     size: Optional[str] = None,
@@ -55,14 +98,17 @@ def search_google_shopping(
     model: Optional[str] = None,
     storage: Optional[str] = None,
     material: Optional[str] = None,
-    max_results: int = 10
+    max_results: int = 10,
+    client: Optional[httpx.AsyncClient] = None,
+    settings: Optional[Settings] = None,
 ) -> List[dict]:
     """
     Search Google Shopping for product prices.
 
     Returns a list of dicts with: retailer, price, currency, url, title
     """
-    settings = get_settings()
+    if settings is None:
+        settings = get_settings()
 
     if not settings.serpapi_key:
         raise ValueError("SERPAPI_KEY not configured")
@@ -100,8 +146,12 @@ def search_google_shopping(
     if "location" in region_cfg:
         params["location"] = region_cfg["location"]
 
-    search = GoogleSearch(params)
-    results = search.get_dict()
+    # Plain httpx + orjson instead of the serpapi client: the wrapper
+    # funnels the (often >100 KB) response through stdlib json and adds
+    # nothing else we use
+    resp = await (client or _get_client()).get(SERPAPI_URL, params=params)
+    resp.raise_for_status()
+    results = orjson.loads(resp.content)
 
     prices = []
     currency = region_cfg["currency"]
@@ -110,14 +160,13 @@ def search_google_shopping(
     shopping_results = results.get("shopping_results", [])
 
     for item in shopping_results[:max_results]:
-        price_str = item.get("price") or item.get("extracted_price")
-        price = None
-
-        # Try extracted_price first (numeric), then parse price string
-        if "extracted_price" in item and item["extracted_price"]:
-            price = float(item["extracted_price"])
-        elif price_str:
-            price = extract_price(price_str)
+        # extracted_price is already numeric when SerpAPI provides it;
+        # only fall back to parsing the display string without it
+        extracted = item.get("extracted_price")
+        if extracted:
+            price = float(extracted)
+        else:
+            price = extract_price(item.get("price"))
 
         if price is None:
             continue
@@ -135,36 +184,29 @@ def search_google_shopping(
 
 
 async def scrape_product_prices(
-    product_id: int,
-    search_query: str,
-    region: str = "eu",
-    size: Optional[str] = None,
-    color: Optional[str] = None,
-    brand: Optional[str] = None,
-    model: Optional[str] = None,
-    storage: Optional[str] = None,
-    material: Optional[str] = None,
+    product,
+    *,
+    client: Optional[httpx.AsyncClient] = None,
+    settings: Optional[Settings] = None,
 ) -> List[dict]:
     """
-    Scrape prices for a product and return results.
-    This is an async wrapper around the sync SerpAPI call.
+    Scrape prices for a product row and return results.
+
+    Accepts anything row-shaped (ProductRow, asyncpg Record, dict) and
+    pulls the search attributes itself, so call sites stop rebuilding
+    the same nine-kwarg shape per product. Callers that own a client
+    (the cron script) pass it through; otherwise the module's lazy
+    shared one is used.
     """
-    import asyncio
-
-    # Run sync SerpAPI call in thread pool
-    loop = asyncio.get_event_loop()
-    prices = await loop.run_in_executor(
-        None,
-        lambda: search_google_shopping(
-            search_query,
-            region=region,
-            size=size,
-            color=color,
-            brand=brand,
-            model=model,
-            storage=storage,
-            material=material,
-        )
+    return await search_google_shopping(
+        product["search_query"],
+        region=product.get("region") or "eu",
+        size=product.get("size"),
+        color=product.get("color"),
+        brand=product.get("brand"),
+        model=product.get("model"),
+        storage=product.get("storage"),
+        material=product.get("material"),
+        client=client,
+        settings=settings,
     )
-
-    return prices
@@ -4,9 +4,21 @@ Standalone scraper script for cron job execution.
 This script scrapes prices for all active products and sends alerts.
 """
 import asyncio
+import logging
 import sys
 from pathlib import Path
 
+import httpx
+
+try:
+    # libuv-backed event loop: C-level dispatch for the socket-heavy
+    # scrape pass; the default loop is a fine fallback where uvloop
+    # isn't available (e.g. Windows dev machines)
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -15,12 +27,55 @@ from app.services.scraper import scrape_product_prices
 from app.services.alerts import check_and_send_alert
 from app.config import get_settings
 
+logger = logging.getLogger("pricespy.scraper")
+
+# Flush accumulated price rows to the DB once the buffer reaches this
+# size, overlapping the write with the scrapes still in flight
+FLUSH_ROWS = 1000
+
+
+async def process_product(
+    product, semaphore: asyncio.Semaphore, client: httpx.AsyncClient, settings
+) -> dict:
+    """Scrape one product, returning its prices (or the error).
+
+    Writing is deferred to run_scraper so the whole pass lands in one
+    bulk flush instead of a transaction per product.
+    """
+    name = product.name
+    try:
+        # The semaphore guards the network call: an unbounded gather
+        # over a large catalog would flood SerpAPI and the selector.
+        # The timeout keeps one hung upstream call from pinning its
+        # semaphore slot for the rest of the pass.
+        async with semaphore:
+            async with asyncio.timeout(settings.scrape_timeout_seconds):
+                prices = await scrape_product_prices(
+                    product, client=client, settings=settings
+                )
+        logger.info("%s: %d prices found", name, len(prices))
+        return {"product": product, "prices": prices}
+    except TimeoutError:
+        logger.error(
+            "%s: scrape timed out after %.0fs",
+            name, settings.scrape_timeout_seconds,
+        )
+        return {"product": product, "error": "timeout"}
+    except Exception as e:
+        logger.error("%s: ERROR: %s", name, e)
+        return {"product": product, "error": str(e)}
+
 
 async def run_scraper():
     """Main scraper function that processes all active products."""
-    print("=" * 50)
-    print("PriceSpy Scraper - Starting")
-    print("=" * 50)
+    logger.info("PriceSpy Scraper - Starting")
+
+    # Fail fast on missing config before opening the pool or querying:
+    # a misconfigured cron run should cost nothing
+    settings = get_settings()
+    if not settings.serpapi_key:
+        logger.error("SERPAPI_KEY not configured. Exiting.")
+        return
 
     # Initialize database connection pool
     await database.init_db()
@@ -28,92 +83,121 @@ async def run_scraper():
     try:
         # Get all active products
         products = await database.get_all_products(active_only=True)
-        print(f"Found {len(products)} active products to scrape")
+        logger.info("Found %d active products to scrape", len(products))
 
         if not products:
-            print("No active products to scrape. Exiting.")
+            logger.info("No active products to scrape. Exiting.")
             return
 
-        settings = get_settings()
-        if not settings.serpapi_key:
-            print("ERROR: SERPAPI_KEY not configured. Exiting.")
-            return
-
-        total_prices = 0
-        total_alerts = 0
+        # The scrape is pure I/O (SerpAPI round-trips), so run the
+        # products concurrently instead of paying each network latency
+        # in sequence; return_exceptions keeps one failure from
+        # cancelling the rest of the pass
+        # Pre-filter: a product whose freshly-recorded lowest price is
+        # still comfortably above target almost never crosses it within
+        # one cron interval, so skip the SerpAPI spend. The margin (and
+        # the filter itself, via 0) is tunable; staleness older than a
+        # day always rescrapes so the cache columns can't pin a product
+        # out of rotation. Freshness rides along on the row, judged by
+        # the DB clock that stamped lowest_price_updated_at.
+        if settings.scrape_skip_margin > 0:
+            to_scrape = []
+            for product in products:
+                if (
+                    product.lowest_price is not None
+                    and product.lowest_price_fresh
+                    and product.lowest_price
+                        > product.target_price * settings.scrape_skip_margin
+                ):
+                    logger.info(
+                        "%s: skipped (lowest %.2f still above target %.2f)",
+                        product.name, product.lowest_price, product.target_price,
+                    )
+                    continue
+                to_scrape.append(product)
+            skipped = len(products) - len(to_scrape)
+            products = to_scrape
+        else:
+            skipped = 0
+
+        # One client for the whole pass: keep-alive reuse spares a fresh
+        # TCP+TLS handshake per product against the same API host
+        semaphore = asyncio.Semaphore(settings.scraper_concurrency)
+        # Stream results as they finish instead of waiting for the whole
+        # gather: rows accumulate per completed product (tracking each
+        # product's cheapest offer inline) and flush in FLUSH_ROWS
+        # batches, so DB write time hides inside the network latency of
+        # the scrapes still in flight
+        rows = []
+        triggered = []
         errors = 0
-
-        for product in products:
-            print(f"\n--- Scraping: {product['name']} ---")
-            print(f"    Query: {product['search_query']}")
-            print(f"    Region: {product.get('region', 'eu')}")
-            print(f"    Category: {product.get('category', 'electronics')}")
-
-            try:
-                # Scrape prices with all product attributes
-                prices = await scrape_product_prices(
-                    product_id=product["id"],
-                    search_query=product["search_query"],
-                    region=product.get("region", "eu"),
-                    size=product.get("size"),
-                    color=product.get("color"),
-                    brand=product.get("brand"),
-                    model=product.get("model"),
-                    storage=product.get("storage"),
-                    material=product.get("material"),
-                )
-
-                if not prices:
-                    print(f"    No prices found")
+        total_prices = 0
+        async with httpx.AsyncClient(
+            timeout=15.0,
+            limits=httpx.Limits(max_keepalive_connections=settings.scraper_concurrency),
+        ) as client:
+            tasks = [
+                asyncio.create_task(process_product(product, semaphore, client, settings))
+                for product in products
+            ]
+            for future in asyncio.as_completed(tasks):
+                item = await future
+                if "error" in item:
+                    errors += 1
                     continue
-
-                print(f"    Found {len(prices)} prices")
-
-                # Store prices in database
-                for price_data in prices:
-                    await database.add_price_record(
-                        product_id=product["id"],
-                        retailer=price_data["retailer"],
-                        price=price_data["price"],
-                        url=price_data["url"],
-                        currency=price_data.get("currency", "EUR"),
-                    )
-
-                total_prices += len(prices)
-
-                # Find lowest price and check for alerts
-                lowest = min(prices, key=lambda x: x["price"])
-                currency = product.get("currency", "EUR")
-                print(f"    Lowest: {currency} {lowest['price']:.2f} at {lowest['retailer']}")
-                print(f"    Target: {currency} {product['target_price']:.2f}")
-
-                if lowest["price"] < product["target_price"]:
-                    print(f"    Price is below target! Checking for alert...")
-
-                    alert_sent = await check_and_send_alert(
-                        product=product,
-                        lowest_price=lowest["price"],
-                        retailer=lowest["retailer"],
-                        url=lowest["url"],
-                    )
-
-                    if alert_sent:
-                        print(f"    Alert sent to {product['user_email']}")
-                        total_alerts += 1
-                    else:
-                        print(f"    Alert skipped (already sent recently)")
-
-            except Exception as e:
-                print(f"    ERROR: {str(e)}")
+                product = item["product"]
+                lowest = None
+                for r in item["prices"]:
+                    rows.append((
+                        product.id,
+                        r["retailer"],
+                        r["price"],
+                        r.get("currency", "EUR"),
+                        r.get("url", ""),
+                    ))
+                    if lowest is None or r["price"] < lowest["price"]:
+                        lowest = r
+                if lowest is not None and lowest["price"] < product.target_price:
+                    triggered.append((product, lowest))
+                if len(rows) >= FLUSH_ROWS:
+                    total_prices += len(rows)
+                    await database.bulk_add_price_records(rows)
+                    rows = []
+
+        # Final partial batch
+        await database.bulk_add_price_records(rows)
+        total_prices += len(rows)
+
+        # Second stage: send the triggered alerts concurrently instead
+        # of paying each email round-trip in sequence
+
+        alert_results = await asyncio.gather(
+            *(
+                check_and_send_alert(
+                    product=product,
+                    lowest_price=lowest["price"],
+                    retailer=lowest["retailer"],
+                    url=lowest["url"],
+                    settings=settings,
+                )
+                for product, lowest in triggered
+            ),
+            return_exceptions=True,
+        )
+        total_alerts = 0
+        for (product, _), sent in zip(triggered, alert_results):
+            if sent is True:
+                logger.info("%s: alert sent to %s", product.name, product.user_email)
+                total_alerts += 1
+            elif isinstance(sent, BaseException):
+                logger.error("%s: alert ERROR: %s", product.name, sent)
                 errors += 1
 
-        print("\n" + "=" * 50)
-        print("PriceSpy Scraper - Complete")
-        print(f"  Products processed: {len(products)}")
-        print(f"  Total prices found: {total_prices}")
-        print(f"  Alerts sent: {total_alerts}")
-        print(f"  Errors: {errors}")
-        print("=" * 50)
+        logger.info(
+            "PriceSpy Scraper - Complete: %d products, %d skipped, "
+            "%d prices, %d alerts, %d errors",
+            len(products), skipped, total_prices, total_alerts, errors,
+        )
 
     finally:
         # Close database connection pool
@@ -121,4 +205,12 @@ async def run_scraper():
 
 
 if __name__ == "__main__":
+    # Single stream handler on stdout; %-style lazy formatting keeps
+    # the concurrent tasks from contending on f-string assembly plus
+    # the stream lock for every line
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(message)s",
+        stream=sys.stdout,
+    )
     asyncio.run(run_scraper())